@@ -1,30 +1,166 @@
 # src/ingestion/births/births.py
 
-import os # By using the "import os" module's standardized interface so a
-          # developer can write a script once and have it work consistently 
-          # regardless of the underlying operating system; which makes the code portable. 
-import shutil
-# shutil mean "shell utilities and is Python’s built-in tool for safely copying, moving, and managing files and directories in data pipelines.
-# Data Engineers use it because...
-    # It works the same on all OSes
-    # Is safer than shelling out to cp or mv
-    # Is easier to test
-    # Plays well with Python pipelines
-from pathlib import Path  #pathlib lets you treat files and folders as objects, not strings.
-                            #lets you build, inspect, and manage filesystem paths safely, 
-                            #cleanly, and portably, which is why it’s everywhere in modern Python and data engineering pipelines.
-from datetime import date #datetime is a class representing a calendar date only YYYY-MM-DD
-                            #this is used for Folder partitioning: ingest_date=2026-01-26  
+import errno  # errno holds the named error codes (EXDEV, ENOSYS, ...) the OS attaches to an OSError
+import logging  # logging sends messages through named loggers that can be switched on/off by level
 
-def main() -> None:  #This function intentionally does't return anything, it automatically returns None
-    # --- Environment config ---
-    raw_base_path = Path(os.getenv("RAW_BASE_PATH", "raw/milagros")).resolve()
+# By using the "import os" module's standardized interface so a
+# developer can write a script once and have it work consistently
+# regardless of the underlying operating system; which makes the code portable.
+import os
+import sys  # sys.platform tells us which OS we're on ("linux", "darwin" for macOS, "win32")
+
+# datetime is a class representing a calendar date only YYYY-MM-DD
+# this is used for Folder partitioning: ingest_date=2026-01-26
+from datetime import date
+
+# pathlib lets you treat files and folders as objects, not strings.
+# lets you build, inspect, and manage filesystem paths safely,
+# cleanly, and portably, which is why it’s everywhere in modern Python and data engineering pipelines.
+from pathlib import Path
+
+# NamedTuple is a tuple whose fields also have names (cfg.raw_base instead of cfg[0])
+from typing import NamedTuple
+
+try:
+    import fcntl  # fcntl exposes the Unix ioctl() call; it doesn't exist on Windows
+except ImportError:
+    fcntl = None
+
+log = logging.getLogger(__name__)
+# __name__ is this module's name, so these messages can be filtered separately from other modules.
+
+_COPY_BUFSIZE = 1024 * 1024
+# 1 MiB read/write buffer for the last-resort copy loop.
+# shutil's default is only 64 KiB on Linux; bigger chunks mean fewer read/write calls for the same file.
+
+
+_FICLONE = 0x40049409
+# Linux ioctl request number for FICLONE: "make dst share src's data blocks" (a reflink).
+# On copy-on-write filesystems (btrfs, XFS) this is a metadata-only operation, no bytes are copied.
+
+
+def _ficlone(src_fd: int, dst_fd: int) -> bool:
+    """Try to reflink src_fd into dst_fd on Linux. Returns True if the clone worked."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+        # ext4, tmpfs, different filesystems, ... -> not supported, use a normal copy instead
+    return True
+
+
+def _clonefile(src: Path, dst: Path) -> bool:
+    """Try to clone src -> dst with macOS clonefile(2) (APFS copy-on-write). Returns True if it worked."""
+    if sys.platform != "darwin":
+        return False
+    import ctypes
+    # ctypes lets Python call C functions from system libraries; only needed on macOS, so imported here
+    try:
+        libc = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+        return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        # os.fsencode turns the path into the bytes the C function expects
+        # clonefile returns 0 on success and -1 on failure (e.g. dst already exists, non-APFS volume)
+    except (OSError, AttributeError):
+        return False
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    Copy src -> dst (content + metadata, like shutil.copy2) moving as few bytes
+    through Python as possible:
+    - reflink (FICLONE on Linux, clonefile on macOS): no data copied at all on copy-on-write filesystems
+    - os.copy_file_range: the kernel copies inside the filesystem (can be a server-side copy or reflink)
+    - os.sendfile: the kernel copies between the two file descriptors
+    - shutil.copyfileobj: plain buffered read/write loop as the last resort
+    """
+    import shutil
+    # shutil mean "shell utilities and is Python’s built-in tool for safely copying, moving, and managing files and directories in data pipelines.
+    # Data Engineers use it because...
+        # It works the same on all OSes
+        # Is safer than shelling out to cp or mv
+        # Is easier to test
+        # Plays well with Python pipelines
+    # It is imported here, not at the top of the file, because only an actual copy needs it;...
+    # ...a run that skips (raw already present) or an Airflow DAG parse never pays for the import.
+
+    if _clonefile(src, dst):
+        shutil.copystat(src, dst)
+        return
+
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        src_fd = fin.fileno()
+        dst_fd = fout.fileno()
+        # fileno() gives the raw OS file descriptor (an int) that the os.* syscalls work with
+        size = os.fstat(src_fd).st_size
+        offset = 0
+        # offset tracks how many bytes are already in dst, so a fallback picks up where the last method stopped
+
+        # 0) reflink: dst now shares src's blocks, nothing left to copy
+        if _ficlone(src_fd, dst_fd):
+            offset = size
+
+        # When one of the kernel copy calls fails it has written nothing, and offset already counts...
+        # ...everything the earlier calls wrote, so any error (cross-filesystem EXDEV, old-kernel ENOSYS,...
+        # ...Docker seccomp EPERM, ...) just means "drop down to the next, slower copy method".
+        # The one exception is ENOSPC (disk full): no copy method can fix that, so it stops the run.
+
+        # 1) copy_file_range (Linux only, so check it exists first)
+        if offset < size and hasattr(os, "copy_file_range"):
+            try:
+                while offset < size:
+                    n = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                    if n == 0:
+                        break
+                    offset += n
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise
+
+        # 2) sendfile (Linux only: on macOS/BSD sendfile can only write to sockets, same rule as shutil)
+        if offset < size and sys.platform.startswith("linux") and hasattr(os, "sendfile"):
+            os.lseek(dst_fd, offset, os.SEEK_SET)
+            # copy_file_range with explicit offsets doesn't move the file position, so move it ourselves
+            try:
+                while offset < size:
+                    n = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                    if n == 0:
+                        break
+                    offset += n
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise
+
+        # 3) buffered read/write loop
+        if offset < size:
+            fin.seek(offset)
+            fout.seek(offset)
+            shutil.copyfileobj(fin, fout, length=_COPY_BUFSIZE)
+
+    shutil.copystat(src, dst)
+    # copystat copies permissions + timestamps, which is the "metadata" half of what copy2 did
+
+
+class Config(NamedTuple):
+    """Environment-driven settings for one ingestion run."""
+    raw_base: Path
+    ingest_date: str
+    source_xlsx: Path
+
+
+def _config() -> Config:
+    # Reads the environment fresh on every call (deliberately not cached): tests and Airflow call main()...
+    # ...many times in one process with a different INGEST_DATE, and today's date changes at midnight.
+    # The reads are cheap dictionary lookups and .absolute() below touches no files.
+    raw_base_path = Path(os.getenv("RAW_BASE_PATH", "raw/milagros")).absolute()
     # os.getenv reads an environment variable
         # "RAW_BASE_PATH" is the environment variable that is read
         # the syntax means if RAW_BASE_PATH is set then read it since it's within the first comma,
         # if it's not set then use the path after the comma
     # "Path(...)" means to convert the string path that we just chose into an object for import os usage
-    # .resolve() comverts the path into an absolute path; not relative path.
+    # .absolute() comverts the path into an absolute path; not relative path.
+    # Unlike .resolve() it doesn't follow symlinks, so it needs no filesystem lookups at all.
 
     ingest_date = os.getenv("INGEST_DATE", "").strip()
     # .strip() removes any whitespace from the beginning and end of the string
@@ -40,16 +176,25 @@ def main() -> None:  #This function intentionally does't return anything, it aut
     ###############
     ###### Change this to take input of data file and process it in my project
     ###### Right now it is only taking "Nacimientos_HGM.xlsx" but I want it to eventually take what data file I input.
-    source_xlsx_path = Path(os.getenv("SOURCE_XLSX_PATH", "data/milagros/Nacimientos_HGM.xlsx")).resolve()
+    source_xlsx_path = Path(os.getenv("SOURCE_XLSX_PATH", "data/milagros/Nacimientos_HGM.xlsx")).absolute()
+
+    return Config(raw_base=raw_base_path, ingest_date=ingest_date, source_xlsx=source_xlsx_path)
+
+
+def main() -> None:  #This function intentionally does't return anything, it automatically returns None
+    # --- Environment config ---
+    cfg = _config()
+    raw_base_path = cfg.raw_base
+    ingest_date = cfg.ingest_date
+    source_xlsx_path = cfg.source_xlsx
 
-    print(f"[milagros] RAW_BASE_PATH={raw_base_path}")
-    # f"..." is a formatted string literal. 
-        # Anything inside {} is evaluated as Python code and inserted into the string
-        # In this example the {raw_base_path} inside the brackets {} is evaluated as the variable assigned... 
-            # ...earlier at LINE # -> raw_base_path = Path(os.getenv("RAW_BASE_PATH", "data/raw/births")).resolve()
+    log.info("[milagros] RAW_BASE_PATH=%s", raw_base_path)
+    # log.info only builds the message when INFO logging is switched on.
+        # %s is a placeholder; the value after the comma (raw_base_path) is put there...
+        # ...lazily, so if INFO is off the string is never formatted at all (unlike an f"..." string).
 
-    print(f"[milgaros] INGEST_DATE={ingest_date}")
-    print(f"[milagros] SOURCE_XLSX_PATH={source_xlsx_path}")
+    log.info("[milagros] INGEST_DATE=%s", ingest_date)
+    log.info("[milagros] SOURCE_XLSX_PATH=%s", source_xlsx_path)
 
     # --- Output paths ---
     out_dir = raw_base_path / f"ingest_date={ingest_date}"
@@ -80,7 +225,7 @@ def main() -> None:  #This function intentionally does't return anything, it aut
         # Second run → skip, no duplication
 
     if success_marker.exists() and dest_file.exists():
-        print(f"[milagros] Raw already present for {ingest_date}; skipping.")
+        log.info("[milagros] Raw already present for %s; skipping.", ingest_date)
         return
 
     # --- Validate source exists ---
@@ -88,18 +233,20 @@ def main() -> None:  #This function intentionally does't return anything, it aut
         raise FileNotFoundError(f"Source XLSX not found: {source_xlsx_path}")
 
     # --- Copy local source into raw landing zone ---
-    print(f"[milagros] Copying source → raw: {source_xlsx_path} → {dest_file}")
-    shutil.copy2(source_xlsx_path, dest_file)
-    # .copy only copies content and .copy2 copies content and metadata
+    log.info("[milagros] Copying source → raw: %s → %s", source_xlsx_path, dest_file)
+    _fast_copy(source_xlsx_path, dest_file)
+    # same result as shutil.copy2 (content + metadata), but lets the kernel move the bytes when it can
 
     # Mark success
     success_marker.touch()
-    print(f"[milagros] Wrote: {dest_file}")
-    print(f"[milagros] Wrote: {success_marker}")
+    log.info("[milagros] Wrote: %s", dest_file)
+    log.info("[milagros] Wrote: %s", success_marker)
 
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # When run directly, send INFO messages to the terminal (Airflow sets up its own logging).
     main()
 
 # This if__name__=="__main__": main() logis is important for Data Engineering...
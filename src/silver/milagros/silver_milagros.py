@@ -1,23 +1,62 @@
 # src/silver/milagros/silver_milagros.py
 
 from __future__ import annotations
+
 # without .
 # As projects grow, it’s common to:
 #    •   reference classes or types defined in other files
 #    •   create circular imports accidentally
 # __future__ annotations prevents an error at import time because of these issues.
+import importlib.util
+import logging
 import os
-import re
+
 # regular expressions
-import unicodedata
+import re
+
 # dealing with special characters
+import unicodedata
 from datetime import date
+from functools import lru_cache
 from pathlib import Path
-
-import pandas as pd
-
-
+from typing import NamedTuple
+
+log = logging.getLogger(__name__)
+# log.info("... %s", value) only formats the message when INFO logging is switched on.
+
+_COMBINING_RANGES = [
+    (0x0300, 0x036F),  # Combining Diacritical Marks (the accents in Spanish: á é í ó ú ñ ü)
+    (0x1AB0, 0x1AFF),  # Combining Diacritical Marks Extended
+    (0x1DC0, 0x1DFF),  # Combining Diacritical Marks Supplement
+    (0x20D0, 0x20FF),  # Combining Diacritical Marks for Symbols
+    (0xFE20, 0xFE2F),  # Combining Half Marks
+]
+_COMBINING_TABLE = dict.fromkeys(
+    cp
+    for lo, hi in _COMBINING_RANGES
+    for cp in range(lo, hi + 1)
+    if unicodedata.combining(chr(cp))
+)
+# {code point: None} for every combining mark (accent) in the ranges above.
+# unicodedata.combining(ch) is greater than 0 if it is an accent and 0 if it is a normal letter.
+# str.translate deletes every character whose table value is None.
+
+_RE_NONALNUM_RUN = re.compile(r"[^a-z0-9]+")
+_RE_SEPARATOR = re.compile(r"[\s_]")
+# re.compile turns a regex pattern into a reusable object once, at import time,...
+# ...so clean_col doesn't go through re's internal pattern cache for every column name.
+
+
+def _collapse_run(m: re.Match[str]) -> str:
+    # A run of non-alphanumeric characters becomes one "_" if it had a space or underscore in it...
+    # ...(a word separator), otherwise it is dropped (punctuation like "-", ".", "(" between letters).
+    return "_" if _RE_SEPARATOR.search(m.group()) else ""
+
+
+@lru_cache(maxsize=4096)
 def clean_col(name: str) -> str:
+    # @lru_cache remembers the result for each header it has already cleaned,...
+    # ...so the same header showing up again (another sheet or file in this run) is returned straight away.
     # with docstring """ the comment in between can be accessed with help() at runtime
     """
     Convert column names to a stable, SQL-friendly format:
@@ -48,18 +87,11 @@ def clean_col(name: str) -> str:
             # Use NFD for Linguistic processing
         # NFC (Normalize Form Composed) keeps accented characters as single character
             # Us NFC for human-readable text
-    name = "".join(ch for ch in name if not unicodedata.combining(ch))
-        # This code loops through every charcter in "name" and checks if it is...
-        # ... not a normal letter, then joins the letter if it is a normal letter only...
-        # ... otherwise the non-normal letter/character gets dropped (accents)
-        # The first ch before the "for" is the expression being returned f
-        # The first ch is what gets appended after the iteration.
-        # The ch answers “What should I output for each element that passes the filter?”
-        # The general form for this is 
-        # ("expression" for "variable" in "iterable" if "condition")
-        # unicodedata.combining(ch) is greater than 0 if it is an accent
-        # unicodedata.combining(ch) is 0 if it is a normal letter
-    name = re.sub(r"\s+", "_", name)
+    name = name.translate(_COMBINING_TABLE)
+        # .translate looks up every character in _COMBINING_TABLE (built once below the imports)...
+        # ...and deletes the ones mapped to None, i.e. the accents NFKD split off.
+        # This does the whole string in one C call instead of looping over characters in Python.
+    name = _RE_NONALNUM_RUN.sub(_collapse_run, name)
     # "r" means use raw strings for regex patterns, otherwise \ will be interpreted...
     # ... as an escape character or line continuation.
     # An escape character is a special character (commonly \) used inside a string...
@@ -68,25 +100,36 @@ def clean_col(name: str) -> str:
         # ... "\\" for literal backslash
         # Line continuation allows a single logical statement...
         # ... to span multiple lines of code.
-    # regular expression, substitute, (pattern, replacement, string being searched and modified)
-    # (\s) means replace any whitespace, (+) means one or more. 
-    name = re.sub(r"[^a-z0-9_]", "", name)
-    # ^ means NOT
-    # This logic removes every character from name that is not a lowercase letter, number, or underscore.
-    name = re.sub(r"_+", "_", name)
-    # replace characters that are one or more underscores with one underscore.
+    # [^a-z0-9]+ means one or more characters in a row that are NOT a lowercase letter or number (^ means NOT).
+    # Each such run is handed to _collapse_run, which decides between "_" and "".
+    # This single scan gives the same result as the old three steps...
+    # ...(spaces -> underscores, remove non-alphanumeric, collapse repeated underscores).
     return name.strip("_")
     # takes aware all underscores before and after the newly modified name and returns the it
 
 
-def main() -> None:
-    # ----- Config -----
-    raw_base = Path(os.getenv("RAW_BASE_PATH", "raw/milagros")).resolve()
-    # used in the pathlib library to transform a relative file path into an absolute, physical path
-    silver_base = Path(os.getenv("SILVER_BASE_PATH", "processed/silver/milagros")).resolve()
+class Config(NamedTuple):
+    """Environment-driven settings for one silver run."""
+    raw_base: Path
+    silver_base: Path
+    ingest_date: str
+
+
+def _config() -> Config:
+    # Read the environment on every main() call (not cached), so a new INGEST_DATE or a new day is always seen.
+    raw_base = Path(os.getenv("RAW_BASE_PATH", "raw/milagros")).absolute()
+    # used in the pathlib library to transform a relative file path into an absolute path...
+    # ...(without touching the filesystem, since these base paths don't need symlinks resolved)
+    silver_base = Path(os.getenv("SILVER_BASE_PATH", "processed/silver/milagros")).absolute()
 
     ingest_date = os.getenv("INGEST_DATE", "").strip() or date.today().isoformat()
     # Use the INGEST_DATE environment variable if it exists and isn’t blank; otherwise, use today’s date
+    return Config(raw_base=raw_base, silver_base=silver_base, ingest_date=ingest_date)
+
+
+def main() -> None:
+    # ----- Config -----
+    raw_base, silver_base, ingest_date = _config()
     raw_file = raw_base / f"ingest_date={ingest_date}" / "Nacimientos_HGM.xlsx"
     # ets you embed Python expressions directly inside a string; in this case {ingest_date}...
     # ...the received value of {ingest_date} is put in the string
@@ -100,8 +143,21 @@ def main() -> None:
     success_marker = silver_out_dir / "_SUCCESS"
 
     # ----- Logging -----
-    print(f"[silver] RAW_FILE={raw_file}")
-    print(f"[silver] OUT_PARQUET={out_parquet}")
+    log.info("[silver] RAW_FILE=%s", raw_file)
+    log.info("[silver] OUT_PARQUET=%s", out_parquet)
+
+    # ----- Idempotency -----
+    # Same guard as the raw ingest: if this partition was already written successfully,...
+    # ...a re-run (e.g. an Airflow retry or backfill) does nothing instead of re-reading the Excel.
+    if success_marker.exists() and out_parquet.exists():
+        log.info("[silver] Silver already present for %s; skipping.", ingest_date)
+        return
+
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    # pandas/pyarrow take a long time to import, so they are only imported once we know there is work to do;...
+    # ...the skip above and an Airflow DAG parse (which just imports this file) never load them.
 
     # ----- Validate raw exists -----
     if not raw_file.exists():
@@ -109,67 +165,23 @@ def main() -> None:
         # raise stops program and returns the error
 
     # ----- Read Excel  -----
-    df = pd.read_excel(raw_file, sheet_name="Nacimientos")
-    # (location, which sheet to read)
+    excel_engine = "calamine" if importlib.util.find_spec("python_calamine") else "openpyxl"
+    # calamine (python-calamine, written in Rust, needs pandas>=2.2) parses .xlsx much faster...
+    # ...and with less memory than openpyxl.
+    # If it isn't installed we fall back to openpyxl, which pandas already opens in read_only (streaming) mode.
+    # Chosen here, after the skip above, so importing this file never has to look for the package.
+    df = pd.read_excel(raw_file, sheet_name="Nacimientos", engine=excel_engine)
+    # (location, which sheet to read, which library parses the .xlsx)
 
     # ----- Standardize column names -----
-    df.columns = [clean_col(c) for c in df.columns]
-    # dr.columns is the list-like object that holds all column names of the DataFrame.
-    # c is the index that lets us know which entry we're on for df.column
-    # puts the column name at the entry of index c into clean_col function defined above
-    # the list of clean_col function outputs is an anonymous temporary list object...
-    # ...stored in memory.  This is filled up with the results of the list as it is being..
-    #... iterated through in clean_col, then sets dr.columns equal to the values of the anonymous...
-    #... temporary list when the loop has completed.
-
-    # ----- Standardize values -----
-    # 1) Trim string-like columns
-    for c in df.columns:
-    # loop through each column name at the index c
-        if df[c].dtype == "object":
-        # at column (aka Series) index c of this DataFrame (aka Table)
-        # df[c] just takes the column/Series of the DataFrame/Table specifically at index c 
-        # This part of the code checks if the Data types of the values to see if it an object
-        # object is pandas signal that the values in the column are text-like..
-        # ...and we can only perform string operations on text.
-        # We check if it's an object because .strip() only works on strings mixed values (strings + blanks)...
-        # ...sometimes numbers stored as text
-        # ABOUT OBJECTS in DataFrames:
-            # Objects behave like strings but are not guaranteed to be strings
-            # Objects could be:
-                # strings ("FEMENINO")
-                # mixed strings + blanks
-                # numbers stored as text ("34")
-                # mixed types ("34", None, " ")
-            # the .str below ensures that all values in the DataFrame are stored as strings and not a mixture  
-            # with an object a value of NaN is a float and None is and Object, this is inconsistent 
-            # with dtype string, null/missing values are stored as <NA> which is consistent.
-
-            df[c] = df[c].astype("string").str.strip()
-            # .astype("string") converts values to pandas nullable string dtype...
-            #...Preserves <NA> cleanly and ensures .str methods behave consistently
-            # string values in DataFrame that get converted to <NA>:
-                # None,NaN / numpy.nan, pd.NA (already missing)
-            
-            # string values in DataFrame that DO NOT get converted to <NA>:
-                # These stay as valid strings unless you explicitly convert them:
-                # "" (empty string)
-                # " " (spaces)
-                # "\t", "\n" (whitespace)
-                # "NA", "null", "None" (literal text)    
-
-
-    # 2) Empty strings -> NA
-    df = df.replace({"": pd.NA})
-        # The dictionary {"": pd.NA} means:
-            # Find: "" (empty string)
-            # Replace with: pd.NA (pandas missing value)
-        # The dictionary is used as input into the .replace only to show that this value change was...
-        #... a part of the Data Contract and not an ad hoc fix.
-
-
-
-    # 3) If there are any "Unnamed: x" columns (common in Excel), drop them
+    df.columns = df.columns.map(clean_col)
+    # df.columns is the Index object that holds all column names of the DataFrame.
+    # .map(clean_col) puts every column name through the clean_col function defined above...
+    # ...and returns a new Index directly, so no temporary Python list is built in between.
+
+    # ----- Drop "Unnamed: x" columns -----
+    # If there are any "Unnamed: x" columns (common in Excel), drop them
+    # This runs right after the rename so the value clean-up below doesn't waste work on them.
         # When pandas reads Excel (or CSV) files, it auto-generates column names...
         #...for columns that don’t have a header. Those generated names look like
             # Examples: 
@@ -190,6 +202,57 @@ def main() -> None:
     #...then stores them in a list called unnamed_cols.  then checks if that unnamed_cols list exists...
     #...if it does then it drops all columns in the dataframe that match the values in the unnamed_cols list
 
+    # ----- Standardize values -----
+    # 1) Trim string-like columns
+    obj_cols = df.select_dtypes(include=["object", "string"]).columns
+    # select_dtypes picks out every column whose dtype is object (or string) in one step, instead of...
+    # ...looping through each column name and checking df[c].dtype == "object" one by one.
+    # "string" is listed too because pandas 3.0 reads text columns as the str dtype, not object.
+    # object is pandas signal that the values in the column are text-like..
+    # ...and we can only perform string operations on text.
+    # We check if it's an object because .strip() only works on strings mixed values (strings + blanks)...
+    # ...sometimes numbers stored as text
+    # ABOUT OBJECTS in DataFrames:
+        # Objects behave like strings but are not guaranteed to be strings
+        # Objects could be:
+            # strings ("FEMENINO")
+            # mixed strings + blanks
+            # numbers stored as text ("34")
+            # mixed types ("34", None, " ")
+        # the .str below ensures that all values in the DataFrame are stored as strings and not a mixture  
+        # with an object a value of NaN is a float and None is and Object, this is inconsistent 
+        # with dtype string, null/missing values are stored as <NA> which is consistent.
+
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].astype("string[pyarrow]").apply(lambda s: s.str.strip())
+        # df[obj_cols] is a smaller DataFrame with only the object columns.
+        # .astype("string[pyarrow]") converts all of them at once, then .apply runs .str.strip() on each column...
+        # ...and the result is written back into those same columns in one assignment.
+        # .astype("string[pyarrow]") converts values to pandas nullable string dtype...
+        #...Preserves <NA> cleanly and ensures .str methods behave consistently
+        # The [pyarrow] part stores the text in Arrow buffers (one block of UTF-8 bytes + offsets)...
+        # ...instead of one Python object per cell, so .str methods run in pyarrow's C++ code...
+        # ...and to_parquet can hand the buffers to the writer without converting them again.
+        # string values in DataFrame that get converted to <NA>:
+            # None,NaN / numpy.nan, pd.NA (already missing)
+
+        # string values in DataFrame that DO NOT get converted to <NA>:
+            # These stay as valid strings unless you explicitly convert them:
+            # "" (empty string)
+            # " " (spaces)
+            # "\t", "\n" (whitespace)
+            # "NA", "null", "None" (literal text)
+
+
+    # 2) Empty strings -> NA
+        # Only the string columns trimmed above can hold "" so only those are checked;...
+        # ...numeric and date columns are left alone instead of scanning the whole DataFrame.
+    if len(obj_cols):
+        df[obj_cols] = df[obj_cols].where(df[obj_cols].ne(""), pd.NA)
+        # .ne("") builds a True/False mask: True where the value is NOT an empty string
+        # .where(mask, pd.NA) keeps values where the mask is True and puts pd.NA where it is False
+        # Find: "" (empty string) -> Replace with: pd.NA (pandas missing value), as part of the Data Contract.
+
 
 
 #################### START HERE TOMORROW 30 JAN 2026##########
@@ -198,15 +261,14 @@ def main() -> None:
 
     # Integers
     int_cols = ["ano", "periodo_de_reporte"]
-    for c in int_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
-
     # Nullable integer ages
     age_cols = ["edad_madre", "edad_padre"]
-    for c in age_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+
+    numeric_cols = [c for c in int_cols + age_cols if c in df.columns]
+    if numeric_cols:
+        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric, errors="coerce").astype("Int64")
+        # Both groups become nullable Int64, so they are converted together in one assignment...
+        # ...instead of rebuilding the DataFrame once per column.
 
     # Key categoricals
     cat_cols = [
@@ -217,7 +279,10 @@ def main() -> None:
     ]
     for c in cat_cols:
         if c in df.columns:
-            df[c] = df[c].astype("string")
+            df[c] = df[c].astype("category")
+            # These columns only hold a handful of distinct values (e.g. FEMENINO / MASCULINO).
+            # "category" stores each distinct value once plus a small integer code per row,...
+            # ...and Parquet writes it as a dictionary-encoded column.
 
 
 
@@ -239,30 +304,53 @@ def main() -> None:
         raise ValueError(f"Missing required columns in Silver: {missing}")
 
     # Step 10.2: Sanity checks
-    if "edad_madre" in df.columns:
-        s = df["edad_madre"].dropna()
-        if ((s < 10) | (s > 60)).any():
-            raise ValueError("edad_madre outside expected range (10–60)")
+    # .between(low, high) is True when low <= value <= high and <NA> for missing values;...
+    # ...fillna(True) lets missing values pass, so no separate dropna() copy is needed.
+    if "edad_madre" in df.columns and not df["edad_madre"].between(10, 60).fillna(True).all():
+        raise ValueError("edad_madre outside expected range (10–60)")
 
-    if "ano" in df.columns:
-        s = df["ano"].dropna()
-        if ((s < 2000) | (s > 2035)).any():
-            raise ValueError("ano outside expected range (2000–2035)")
+    if "ano" in df.columns and not df["ano"].between(2000, 2035).fillna(True).all():
+        raise ValueError("ano outside expected range (2000–2035)")
 
 
 
 
 
     # ----- Write Silver Parquet -----
-    df.to_parquet(out_parquet, index=False)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Convert the DataFrame to an Arrow table (pyarrow already converts columns on several threads by default).
+    # pq.write_table has no use_threads option, so the Parquet encoding itself runs the way pyarrow decides.
+    tmp_parquet = out_parquet.with_suffix(".parquet.tmp")
+    try:
+        pq.write_table(
+            table,
+            tmp_parquet,
+            compression="zstd",
+            compression_level=3,
+            row_group_size=128_000,
+            data_page_size=1 << 20,
+            use_dictionary=True,
+            write_statistics=True,
+        )
+        # zstd level 3 gives smaller files than the default snappy at about the same write speed.
+        # Bigger row groups (128k rows) and 1 MiB data pages make later scans of the silver table faster.
+        # Dictionary encoding + min/max statistics help downstream readers skip and compress repeated values.
+        os.replace(tmp_parquet, out_parquet)
+        # Write to a temporary file first, then rename it to the real name.
+        # The rename is atomic: a crash mid-write never leaves a half-written milagros_hgm.parquet.
+    except BaseException:
+        # If the write or rename fails, delete the partial .tmp file and let the original error stop the run.
+        tmp_parquet.unlink(missing_ok=True)
+        raise
     success_marker.touch()
 
     # ----- Minimal verification logs -----
-    print(f"[silver] rows={len(df)} cols={len(df.columns)}")
-    print(f"[silver] wrote={out_parquet}")
-    print(f"[silver] wrote={success_marker}")
-    print("[silver] columns:", df.columns.tolist())
+    log.info("[silver] rows=%d cols=%d", len(df), len(df.columns))
+    log.info("[silver] wrote=%s", out_parquet)
+    log.info("[silver] wrote=%s", success_marker)
+    log.info("[silver] columns: %s", df.columns.tolist())
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     main()
\ No newline at end of file
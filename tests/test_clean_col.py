@@ -0,0 +1,33 @@
+import re
+import unicodedata
+
+import pytest
+
+from src.silver.milagros.silver_milagros import clean_col
+
+
+def _clean_col_three_pass(name: str) -> str:
+    # The original clean_col, kept here to check the single-scan version against it.
+    name = name.strip().lower()
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    name = re.sub(r"\s+", "_", name)
+    name = re.sub(r"[^a-z0-9_]", "", name)
+    name = re.sub(r"_+", "_", name)
+    return name.strip("_")
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("Año", "ano"),
+        ("Profesión certificador", "profesion_certificador"),
+        ("Unnamed: 3", "unnamed_3"),
+        ("x-y.z", "xyz"),
+        ("a _ b", "a_b"),
+        ("  __x__ ", "x"),
+    ],
+)
+def test_clean_col_matches_three_pass_version(header, expected):
+    assert clean_col(header) == expected
+    assert clean_col(header) == _clean_col_three_pass(header)
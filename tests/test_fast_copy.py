@@ -0,0 +1,81 @@
+import errno
+import os
+import sys
+
+import pytest
+
+from src.ingestion.milagros import milagros
+
+CHUNK = 1000
+
+
+def _fail_after_first_call(write_chunk, err):
+    # Copies one CHUNK on the first call, then raises err on every later call.
+    calls = {"n": 0}
+
+    def fake(*args):
+        calls["n"] += 1
+        if calls["n"] > 1:
+            raise OSError(err, os.strerror(err))
+        return write_chunk(*args)
+
+    return fake
+
+
+def _copy_file_range_chunk(src_fd, dst_fd, count, offset_src, offset_dst):
+    return os.pwrite(
+        dst_fd, os.pread(src_fd, min(count, CHUNK), offset_src), offset_dst
+    )
+
+
+def _sendfile_chunk(out_fd, in_fd, offset, count):
+    return os.write(out_fd, os.pread(in_fd, min(count, CHUNK), offset))
+
+
+@pytest.fixture
+def source(tmp_path):
+    src = tmp_path / "Nacimientos_HGM.xlsx"
+    src.write_bytes(os.urandom(10 * CHUNK + 123))
+    return src
+
+
+@pytest.fixture
+def no_reflink(monkeypatch):
+    monkeypatch.setattr(milagros, "_clonefile", lambda src, dst: False)
+    monkeypatch.setattr(milagros, "_ficlone", lambda src_fd, dst_fd: False)
+    monkeypatch.setattr(sys, "platform", "linux")
+
+
+def test_fast_copy_falls_back_through_every_step(
+    tmp_path, source, no_reflink, monkeypatch
+):
+    monkeypatch.setattr(
+        os,
+        "copy_file_range",
+        _fail_after_first_call(_copy_file_range_chunk, errno.EPERM),
+        raising=False,
+    )
+    monkeypatch.setattr(
+        os,
+        "sendfile",
+        _fail_after_first_call(_sendfile_chunk, errno.ENOTSOCK),
+        raising=False,
+    )
+    dst = tmp_path / "out.xlsx"
+
+    milagros._fast_copy(source, dst)
+
+    assert dst.read_bytes() == source.read_bytes()
+
+
+def test_fast_copy_raises_when_disk_is_full(tmp_path, source, no_reflink, monkeypatch):
+    monkeypatch.setattr(
+        os,
+        "copy_file_range",
+        _fail_after_first_call(_copy_file_range_chunk, errno.ENOSPC),
+        raising=False,
+    )
+
+    with pytest.raises(OSError) as exc:
+        milagros._fast_copy(source, tmp_path / "out.xlsx")
+    assert exc.value.errno == errno.ENOSPC
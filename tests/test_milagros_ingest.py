@@ -0,0 +1,17 @@
+from src.ingestion.milagros import milagros
+
+
+def test_main_picks_up_a_new_ingest_date_each_call(tmp_path, monkeypatch):
+    src = tmp_path / "Nacimientos_HGM.xlsx"
+    src.write_bytes(b"xlsx bytes")
+    monkeypatch.setenv("RAW_BASE_PATH", str(tmp_path / "raw"))
+    monkeypatch.setenv("SOURCE_XLSX_PATH", str(src))
+
+    for ingest_date in ["2026-01-01", "2026-01-02"]:
+        monkeypatch.setenv("INGEST_DATE", ingest_date)
+        milagros.main()
+
+    for ingest_date in ["2026-01-01", "2026-01-02"]:
+        out_dir = tmp_path / "raw" / f"ingest_date={ingest_date}"
+        assert (out_dir / "Nacimientos_HGM.xlsx").read_bytes() == b"xlsx bytes"
+        assert (out_dir / "_SUCCESS").exists()
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from src.silver.milagros import silver_milagros
+
+INGEST_DATE = "2026-01-01"
+
+
+@pytest.fixture
+def silver_env(tmp_path, monkeypatch):
+    raw_dir = tmp_path / "raw" / f"ingest_date={INGEST_DATE}"
+    raw_dir.mkdir(parents=True)
+    pd.DataFrame(
+        {
+            "Año": [2020, 2021],
+            "Periodo de reporte": [1, 2],
+            "Sexo": ["FEMENINO", "MASCULINO"],
+            "Fecha nacimiento": ["2020-01-01", "2021-02-03"],
+            "Edad madre": [25, 31],
+            "Municipio residencia": ["Medellín", "Bello"],
+            "Edad padre": [30, 33],
+        }
+    ).to_excel(raw_dir / "Nacimientos_HGM.xlsx", sheet_name="Nacimientos", index=False)
+    monkeypatch.setenv("RAW_BASE_PATH", str(tmp_path / "raw"))
+    monkeypatch.setenv("SILVER_BASE_PATH", str(tmp_path / "silver"))
+    monkeypatch.setenv("INGEST_DATE", INGEST_DATE)
+    return tmp_path / "silver" / f"ingest_date={INGEST_DATE}"
+
+
+def test_main_skips_partition_that_already_succeeded(silver_env):
+    silver_milagros.main()
+    out_parquet = silver_env / "milagros_hgm.parquet"
+    assert (silver_env / "_SUCCESS").exists()
+    mtime = out_parquet.stat().st_mtime_ns
+
+    silver_milagros.main()
+
+    assert out_parquet.stat().st_mtime_ns == mtime
+
+
+def test_main_leaves_no_partial_parquet_when_write_fails(silver_env, monkeypatch):
+    import pyarrow.parquet as pq
+
+    def failing_write_table(table, where, **kwargs):
+        with open(where, "wb") as f:
+            f.write(b"PAR1 half")
+        raise OSError("disk went away")
+
+    monkeypatch.setattr(pq, "write_table", failing_write_table)
+
+    with pytest.raises(OSError, match="disk went away"):
+        silver_milagros.main()
+
+    assert not (silver_env / "_SUCCESS").exists()
+    assert not (silver_env / "milagros_hgm.parquet").exists()
+    assert list(silver_env.glob("*.parquet.tmp")) == []